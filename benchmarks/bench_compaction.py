@@ -0,0 +1,130 @@
+"""
+軟刪除 vs 硬刪除：大量刪除的寫入延遲，以及背景壓縮後回收的檔案空間
+用法：python benchmarks/bench_compaction.py [總任務數] [刪除比例]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compaction  # noqa: E402
+import database  # noqa: E402
+from database import now_stamp  # noqa: E402
+
+
+def seed(total):
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        per_day = 50
+        for d in range(total // per_day):
+            cursor.execute("INSERT INTO daily_logs (log_date) VALUES (?)", (f"day-{d:05d}",))
+            log_id = cursor.lastrowid
+            cursor.executemany('''
+                               INSERT INTO log_items (item_id, log_id, title, content, is_done, sort_order, tags,
+                                                      origin_id, parent_id)
+                               VALUES (?, ?, ?, ?, 0, ?, 'bench', 'root', ?)
+                               ''', [(f"{d}-{i}", log_id, f"task {i}", "note " * 100, i,
+                                      f"{d - 1}-{i}" if d else None) for i in range(per_day)])
+        conn.commit()
+
+
+def delete_ids(total, ratio):
+    """刪除最舊的 ratio 比例 (整天整天地刪，讓資料頁能真正清空)"""
+    days = int(total // 50 * ratio)
+    return [f"{d}-{i}" for d in range(days) for i in range(50)]
+
+
+def timed_write(sql_fn, ids):
+    """回傳 (耗時 ms, 影響列數)"""
+    with database.get_db_connection() as conn:
+        t0 = time.perf_counter()
+        rows = sql_fn(conn.cursor(), ids)
+        conn.commit()
+        return (time.perf_counter() - t0) * 1000, rows
+
+
+def hard_delete(cursor, ids):
+    rows = 0
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        cursor.execute(f"DELETE FROM log_items WHERE item_id IN ({','.join('?' * len(chunk))})", chunk)
+        rows += cursor.rowcount
+    return rows
+
+
+def soft_delete(cursor, ids):
+    stamp = now_stamp()
+    rows = 0
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        cursor.execute(f"UPDATE log_items SET deleted_at = ? WHERE item_id IN ({','.join('?' * len(chunk))})",
+                       (stamp, *chunk))
+        rows += cursor.rowcount
+    return rows
+
+
+def db_size():
+    return sum(os.path.getsize(database.DB_NAME + s) for s in ("", "-wal") if os.path.exists(database.DB_NAME + s))
+
+
+def checkpoint():
+    with database.get_db_connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        database.DB_NAME = os.path.join(tmp, "pristine.db")
+        database.init_db()
+        seed(total)
+        checkpoint()
+        # 硬刪除與軟刪除各用一份獨立副本：共用檔案時，硬刪除留下的 -wal 會被重播到「還原」後的資料庫上
+        for name in ("hard.db", "soft.db"):
+            shutil.copy2(database.DB_NAME, os.path.join(tmp, name))
+        ids = delete_ids(total, ratio)
+        print(f"rows={total:,}  deleting={len(ids):,}  size={db_size() / 1e6:.1f} MB")
+
+        database.DB_NAME = os.path.join(tmp, "hard.db")
+        ms, rows = timed_write(hard_delete, ids)
+        assert rows == len(ids), f"hard delete removed {rows} rows, expected {len(ids)}"
+        print(f"hard delete:   {ms:8.1f} ms (single write transaction)")
+
+        database.DB_NAME = os.path.join(tmp, "soft.db")
+        ms, rows = timed_write(soft_delete, ids)
+        assert rows == len(ids), f"tombstone marked {rows} rows, expected {len(ids)}"
+        print(f"tombstone:     {ms:8.1f} ms (single write transaction)")
+
+        checkpoint()
+        before = db_size()
+        batch_times = []
+        original = compaction.run_write
+
+        def timed_run_write(func, *args):
+            t0 = time.perf_counter()
+            result = original(func, *args)
+            batch_times.append((time.perf_counter() - t0) * 1000)
+            return result
+
+        compaction.run_write = timed_run_write
+        t0 = time.perf_counter()
+        result = compaction.compact()
+        elapsed = (time.perf_counter() - t0) * 1000
+        checkpoint()
+        after = db_size()
+        assert result["items"] == len(ids), f"compaction purged {result['items']} items, expected {len(ids)}"
+
+        print(f"compaction:    {elapsed:8.1f} ms total, {len(batch_times)} transactions, "
+              f"longest {max(batch_times):.1f} ms  purged={result}")
+        print(f"file size:     {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+              f"(reclaimed {(before - after) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
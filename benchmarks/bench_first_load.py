@@ -0,0 +1,98 @@
+"""
+首次載入成本 (不需 headless browser)：統計首屏需要的靜態資源位元組與 API 請求數
+- 靜態資源：解析 static/index.html 中直接引用的 script / stylesheet，其餘 static/js 模組視為延遲載入
+- API：比較舊流程 (get-log + get-habits + 每張卡片一次 get-project-history) 與 /bootstrap
+用法：python benchmarks/bench_first_load.py [當日任務數] [習慣數]
+"""
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC = os.path.join(ROOT, "static")
+sys.path.insert(0, ROOT)
+
+DATE = "2026-01-15"
+
+
+def static_assets():
+    with open(os.path.join(STATIC, "index.html"), encoding="utf-8") as f:
+        html = f.read()
+    refs = re.findall(r'<script[^>]+src="([^"]+)"', html) + \
+        re.findall(r'<link[^>]+rel="stylesheet"[^>]+href="([^"]+)"', html) + \
+        re.findall(r'<link[^>]+href="([^"]+)"[^>]+rel="stylesheet"', html)
+    local = {r: os.path.getsize(os.path.join(STATIC, r)) for r in refs if not r.startswith("http")}
+    cdn = [r for r in refs if r.startswith("http")]
+    eager_js = {os.path.basename(r) for r in local if r.endswith(".js")}
+    lazy = {f"js/{f}": os.path.getsize(os.path.join(STATIC, "js", f))
+            for f in os.listdir(os.path.join(STATIC, "js")) if f.endswith(".js") and f not in eager_js}
+    return len(html.encode("utf-8")), local, cdn, lazy
+
+
+def seed(items, habits):
+    import database
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        for d in range(1, 16):
+            cursor.execute("INSERT INTO daily_logs (log_date) VALUES (?)", (f"2026-01-{d:02d}",))
+            log_id = cursor.lastrowid
+            cursor.executemany('''
+                               INSERT INTO log_items (item_id, log_id, title, content, is_done, sort_order, tags)
+                               VALUES (?, ?, ?, ?, 0, ?, 'bench')
+                               ''', [(f"{d}-{i}", log_id, f"task {i}", "note " * 10, i) for i in range(items)])
+        cursor.executemany("INSERT INTO habit_definitions (title, color) VALUES (?, '#3B82F6')",
+                           [(f"habit {i}",) for i in range(habits)])
+        cursor.execute("INSERT INTO habit_groups (name) VALUES ('Morning')")
+        conn.commit()
+
+
+def measure(client, paths):
+    total = 0
+    for p in paths:
+        r = client.get(p)
+        assert r.status_code == 200, (p, r.status_code)
+        total += len(r.content)
+    return len(paths), total
+
+
+def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    habits = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+
+    html_bytes, local, cdn, lazy = static_assets()
+    print(f"index.html: {html_bytes:,} B")
+    for r, size in local.items():
+        print(f"  eager {r:<24} {size:>8,} B")
+    for r in cdn:
+        print(f"  eager (CDN) {r}")
+    for r, size in lazy.items():
+        print(f"  lazy  {r:<24} {size:>8,} B")
+    first = html_bytes + sum(local.values())
+    print(f"first-load local bytes: {first:,} B in {1 + len(local)} requests "
+          f"(+{len(cdn)} CDN); deferred: {sum(lazy.values()):,} B")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        shutil.copytree(STATIC, os.path.join(tmp, "static"))
+        import database
+        database.DB_NAME = os.path.join(tmp, "bench.db")
+
+        from fastapi.testclient import TestClient
+        import main as app_main
+        seed(items, habits)
+        client = TestClient(app_main.app)
+
+        history = [f"/get-project-history?title=task%20{i}&tags=bench" for i in range(items)]
+        legacy = measure(client, [f"/get-log/{DATE}", f"/get-habits?date={DATE}"] + history)
+        boot = measure(client, [f"/bootstrap?date={DATE}"])
+        deferred = measure(client, history)
+
+        print(f"API legacy first load:    {legacy[0]:>3} requests  {legacy[1]:>8,} B (history awaited per card)")
+        print(f"API /bootstrap first load: {boot[0]:>3} requests  {boot[1]:>8,} B "
+              f"(+{deferred[0]} history requests deferred to idle, {deferred[1]:,} B)")
+
+
+if __name__ == "__main__":
+    main()
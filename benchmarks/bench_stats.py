@@ -0,0 +1,108 @@
+"""
+統計彙總表效能比較：彙總表查詢 vs 即時掃描 log_items
+用法：python benchmarks/bench_stats.py [天數] [每日任務數]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from rollups import apply_rows, bucket_key, check_rollups, fetch_rows, rebuild_rollups  # noqa: E402
+
+TAGS = ["dev", "ops", "study", "health", "writing", "review", "design", "infra"]
+
+
+def seed(cursor, days, per_day):
+    origins = [str(uuid.uuid4()) for _ in range(50)]
+    for d in range(days):
+        log_date = time.strftime("%Y-%m-%d", time.gmtime(1577836800 + d * 86400))
+        cursor.execute("INSERT INTO daily_logs (log_date) VALUES (?)", (log_date,))
+        log_id = cursor.lastrowid
+        cursor.executemany('''
+                           INSERT INTO log_items (item_id, log_id, title, content, is_done, sort_order, tags, origin_id)
+                           VALUES (?, ?, ?, '', ?, ?, ?, ?)
+                           ''', [(str(uuid.uuid4()), log_id, f"task {i}", random.random() < 0.6, i,
+                                  " ".join(random.sample(TAGS, random.randint(0, 3))),
+                                  random.choice(origins + [None])) for i in range(per_day)])
+
+
+def on_the_fly(cursor, granularity, start, end):
+    """不使用彙總表：掃描全部原始列並在 Python 端分桶"""
+    cursor.execute('''SELECT dl.log_date, li.tags, li.is_done
+                      FROM daily_logs dl
+                               JOIN log_items li ON dl.id = li.log_id''')
+    lo, hi = bucket_key(granularity, start), bucket_key(granularity, end)
+    out = defaultdict(lambda: [0, 0])
+    for r in cursor.fetchall():
+        b = bucket_key(granularity, r["log_date"])
+        if lo <= b <= hi:
+            for tag in set((r["tags"] or "").split()):
+                out[(b, tag)][0 if r["is_done"] else 1] += 1
+    return out
+
+
+def from_rollups(cursor, granularity, start, end):
+    cursor.execute('''SELECT bucket, dim_key, done, undone
+                      FROM stats_rollups
+                      WHERE granularity = ? AND dimension = 'tag' AND bucket BETWEEN ? AND ?''',
+                   (granularity, bucket_key(granularity, start), bucket_key(granularity, end)))
+    return {(r["bucket"], r["dim_key"]): [r["done"], r["undone"]] for r in cursor.fetchall()}
+
+
+def timed(fn, *args, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, result
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        database.DB_NAME = os.path.join(tmp, "bench.db")
+        database.init_db()
+
+        with database.get_db_connection() as conn:
+            cursor = conn.cursor()
+            seed(cursor, days, per_day)
+            ms, _ = timed(rebuild_rollups, cursor, repeat=1)
+            conn.commit()
+            print(f"rows={days * per_day:,}  rebuild={ms:.1f} ms")
+
+            for granularity, start, end in [("day", "2020-06-01", "2020-06-30"),
+                                            ("week", "2020-01-01", "2020-12-31"),
+                                            ("month", "2020-01-01", "2022-12-31")]:
+                ms_fly, fly = timed(on_the_fly, cursor, granularity, start, end)
+                ms_roll, roll = timed(from_rollups, cursor, granularity, start, end)
+                assert dict(fly) == roll, "rollups disagree with raw rows"
+                print(f"{granularity:>5} {start}..{end}: on-the-fly={ms_fly:8.2f} ms  "
+                      f"rollups={ms_roll:6.2f} ms  ({ms_fly / ms_roll:.0f}x)")
+
+            # 單日增量更新成本 (save_log 寫入路徑的額外負擔)
+            def resave_day():
+                rows = fetch_rows(cursor, "li.log_id = ?", (1,))
+                apply_rows(cursor, rows, sign=-1)
+                apply_rows(cursor, rows)
+
+            ms, _ = timed(resave_day)
+            print(f"incremental day update={ms:.2f} ms")
+
+            ms, mismatches = timed(check_rollups, cursor, repeat=1)
+            print(f"consistency check={ms:.1f} ms  mismatches={len(mismatches)}")
+
+
+if __name__ == "__main__":
+    main()
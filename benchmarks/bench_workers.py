@@ -0,0 +1,102 @@
+"""
+多 worker 讀取吞吐量：以 1..N 個 worker 啟動伺服器，量測 /get-log 每秒請求數
+用法：python benchmarks/bench_workers.py [最大 worker 數] [每輪秒數]
+"""
+import http.client
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PORT = 8765
+DATES = [f"2026-01-{d:02d}" for d in range(1, 29)]
+
+
+def seed(tmp):
+    """在暫存目錄建立測試資料庫：28 天 × 每天 20 筆任務"""
+    import database
+    database.DB_NAME = os.path.join(tmp, "work_logs.db")
+    database.init_db()
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        for d in DATES:
+            cursor.execute("INSERT INTO daily_logs (log_date) VALUES (?)", (d,))
+            log_id = cursor.lastrowid
+            cursor.executemany('''
+                               INSERT INTO log_items (item_id, log_id, title, content, is_done, sort_order, tags)
+                               VALUES (?, ?, ?, ?, ?, ?, 'bench')
+                               ''', [(f"{d}-{i}", log_id, f"task {i}", "note " * 20, i % 2, i) for i in range(20)])
+        conn.commit()
+
+
+def client(duration, counter):
+    conn = http.client.HTTPConnection("127.0.0.1", PORT)
+    done = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        conn.request("GET", f"/get-log/{DATES[done % len(DATES)]}")
+        body = conn.getresponse().read()
+        assert json.loads(body)["status"] == "success"
+        done += 1
+    with counter.get_lock():
+        counter.value += done
+
+
+def wait_ready(timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            c = http.client.HTTPConnection("127.0.0.1", PORT, timeout=1)
+            c.request("GET", f"/get-log/{DATES[0]}")
+            c.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def run(tmp, workers, clients, duration):
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "main.py"),
+                               "--port", str(PORT), "--workers", str(workers)],
+                              cwd=tmp, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready()
+        counter = multiprocessing.Value("i", 0)
+        procs = [multiprocessing.Process(target=client, args=(duration, counter)) for _ in range(clients)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        return counter.value / duration
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else min(os.cpu_count() or 1, 4)
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copytree(os.path.join(ROOT, "static"), os.path.join(tmp, "static"))
+        seed(tmp)
+
+        # 每一輪使用相同的客戶端數量，倍率才只反映伺服器端的擴展
+        clients = 4 * max_workers
+        print(f"clients={clients}")
+        base = None
+        for workers in range(1, max_workers + 1):
+            rps = run(tmp, workers, clients, duration)
+            base = base or rps
+            print(f"workers={workers}  {rps:8.0f} req/s  ({rps / base:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
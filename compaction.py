@@ -0,0 +1,170 @@
+"""
+墓碑壓縮 (Tombstone Compaction)
+刪除操作只標記 deleted_at，這裡的背景作業負責：
+1. 以血緣欄位一次性重新掛載孤兒節點 (parent_id 指向墓碑者改掛到最近的存活祖先)
+2. 分批清除墓碑列 (每批一筆獨立交易，經由寫入協調器排隊，不會長時間佔住寫入鎖)
+3. `PRAGMA incremental_vacuum` 分段歸還空頁 (只能歸還整頁清空的空間，零散刪除留下的半滿頁不會縮小檔案)
+"""
+import os
+import threading
+
+import database
+from database import file_lock, now_stamp
+from writer import run_write
+
+COMPACT_INTERVAL = float(os.environ.get("DAILY_LOGGER_COMPACT_INTERVAL", "600"))
+COMPACT_BATCH = int(os.environ.get("DAILY_LOGGER_COMPACT_BATCH", "500"))
+VACUUM_PAGES = 256
+
+
+def _reparent_orphans_tx(cursor):
+    """
+    一次性重新掛載所有以墓碑為父層的存活節點
+    連續多層墓碑會一路往上追到最近的存活祖先；整條鏈都已刪除時改掛回家族始祖 (origin_id)，
+    始祖本身也已刪除則設為 NULL。
+    舊版硬刪除留下的懸空 parent_id (指向不存在的列) 也在同一個 UPDATE 中以始祖規則修復。
+    回傳本輪截止時間戳，早於此時間的墓碑才可被清除。
+    """
+    cutoff = now_stamp()
+    cursor.execute('''
+                   SELECT item_id, parent_id, origin_id
+                   FROM log_items
+                   WHERE deleted_at IS NOT NULL
+                     AND deleted_at < ?
+                   ''', (cutoff,))
+    dead = {r["item_id"]: (r["parent_id"], r["origin_id"]) for r in cursor.fetchall() if r["item_id"]}
+
+    cursor.execute("SELECT item_id FROM log_items WHERE deleted_at IS NOT NULL")
+    all_dead = {r["item_id"] for r in cursor.fetchall()}
+
+    ancestor = {}  # 墓碑 -> 最近的存活祖先 (或本輪不處理的新墓碑)；長鏈只走一次
+
+    def live_ancestor(item_id):
+        path = []
+        node = item_id
+        while node in dead and node not in ancestor and node not in path:
+            path.append(node)
+            node = dead[node][0]
+        if node in ancestor:
+            found = ancestor[node]
+        elif node in path:
+            found = None  # 循環參照
+        else:
+            # 存活節點、NULL，或墓碑太新 (晚於截止點) 先掛在它下面，下一輪再處理
+            found = node
+        for n in path:
+            ancestor[n] = found
+        return found
+
+    def resolve(item_id):
+        parent = live_ancestor(item_id)
+        origin = dead[item_id][1]
+        if parent is None and origin and origin not in all_dead and origin != item_id:
+            parent = origin
+        return parent
+
+    # 先把「墓碑 -> 新父層」對照表寫進暫存表，再以單一 UPDATE 完成所有子節點的重新掛載
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS reparent_map (dead_id TEXT PRIMARY KEY, new_parent TEXT)")
+    cursor.execute("DELETE FROM reparent_map")
+    cursor.executemany("INSERT INTO reparent_map (dead_id, new_parent) VALUES (?, ?)",
+                       [(i, resolve(i)) for i in dead])
+    cursor.execute('''
+                   UPDATE log_items
+                   SET parent_id = CASE
+                       WHEN parent_id IN (SELECT dead_id FROM reparent_map)
+                           THEN (SELECT new_parent FROM reparent_map WHERE dead_id = log_items.parent_id)
+                       WHEN origin_id IS NOT NULL AND origin_id != item_id
+                           AND EXISTS (SELECT 1 FROM log_items o
+                                       WHERE o.item_id = log_items.origin_id AND o.deleted_at IS NULL)
+                           THEN origin_id
+                       END
+                   WHERE deleted_at IS NULL
+                     AND parent_id IS NOT NULL
+                     AND (parent_id IN (SELECT dead_id FROM reparent_map)
+                          OR NOT EXISTS (SELECT 1 FROM log_items p WHERE p.item_id = log_items.parent_id))
+                   ''')
+    return cutoff
+
+
+def _purge_items_tx(cursor, cutoff: str, batch: int):
+    """清除一批早於截止點的日誌墓碑，回傳清除筆數"""
+    cursor.execute('''
+                   DELETE FROM log_items
+                   WHERE id IN (SELECT id FROM log_items
+                                WHERE deleted_at IS NOT NULL AND deleted_at < ?
+                                LIMIT ?)
+                   ''', (cutoff, batch))
+    return cursor.rowcount
+
+
+def _purge_habits_tx(cursor, cutoff: str, batch: int):
+    """清除一批已刪除習慣的打卡紀錄；紀錄清空後再移除習慣定義本身"""
+    cursor.execute('''
+                   DELETE FROM habit_logs
+                   WHERE id IN (SELECT l.id FROM habit_logs l
+                                JOIN habit_definitions h ON h.id = l.habit_id
+                                WHERE h.deleted_at IS NOT NULL AND h.deleted_at < ?
+                                LIMIT ?)
+                   ''', (cutoff, batch))
+    purged = cursor.rowcount
+    if purged < batch:
+        cursor.execute('''
+                       DELETE FROM habit_definitions
+                       WHERE deleted_at IS NOT NULL AND deleted_at < ?
+                         AND id NOT IN (SELECT habit_id FROM habit_logs WHERE habit_id IS NOT NULL)
+                       ''', (cutoff,))
+        purged += cursor.rowcount
+    return purged
+
+
+def _incremental_vacuum_tx(cursor, pages: int):
+    """歸還最多 pages 個空頁，回傳剩餘空頁數"""
+    # sqlite3 的 execute 只會 step 這個 pragma 一次 (每次只釋放一頁)；executescript 才會執行到底
+    cursor.connection.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+    cursor.execute("PRAGMA freelist_count")
+    return cursor.fetchone()[0]
+
+
+def compact(batch: int = COMPACT_BATCH):
+    """執行一輪完整壓縮，回傳各步驟處理量"""
+    cutoff = run_write(_reparent_orphans_tx)
+
+    items = 0
+    while True:
+        n = run_write(_purge_items_tx, cutoff, batch)
+        items += n
+        if n < batch:
+            break
+
+    habits = 0
+    while True:
+        n = run_write(_purge_habits_tx, cutoff, batch)
+        habits += n
+        if n < batch:
+            break
+
+    while run_write(_incremental_vacuum_tx, VACUUM_PAGES) > 0:
+        pass
+
+    return {"items": items, "habit_rows": habits}
+
+
+def _compact_loop(stop: threading.Event, interval: float):
+    while not stop.wait(interval):
+        # 多 worker 時只讓取得鎖的那一個執行本輪壓縮 (路徑於執行時讀取，才會跟著 DB_NAME 的覆寫)
+        with file_lock(f"{database.DB_NAME}.compact.lock", blocking=False) as acquired:
+            if not acquired:
+                continue
+            try:
+                result = compact()
+                if result["items"] or result["habit_rows"]:
+                    print(f"🧹 墓碑壓縮完成: {result}")
+            except Exception as e:
+                print(f"⚠️ 墓碑壓縮失敗: {e}")
+
+
+def start_compactor(interval: float = COMPACT_INTERVAL):
+    """啟動背景壓縮執行緒，回傳可用來停止的 Event"""
+    stop = threading.Event()
+    threading.Thread(target=_compact_loop, args=(stop, interval), daemon=True).start()
+    return stop
@@ -1,9 +1,11 @@
 import sqlite3
 import os
-import shutil
+from contextlib import contextmanager
 from datetime import datetime
+from rollups import rebuild_rollups
 
 DB_NAME = "work_logs.db"
+STARTUP_DONE_ENV = "DAILY_LOGGER_STARTUP_DONE"
 
 
 def get_db_connection():
@@ -12,6 +14,11 @@ def get_db_connection():
     return conn
 
 
+def now_stamp() -> str:
+    """墓碑 (tombstone) 時間戳記，精確到微秒以便與壓縮批次的截止點比較"""
+    return datetime.now().isoformat(timespec="microseconds")
+
+
 def backup_db():
     """啟動時自動備份資料庫"""
     if not os.path.exists("backups"):
@@ -22,12 +29,57 @@ def backup_db():
 
     if not os.path.exists(backup_filename) and os.path.exists(DB_NAME):
         try:
-            shutil.copy2(DB_NAME, backup_filename)
+            # 使用 SQLite 線上備份 API：WAL 模式下 -wal 檔中尚未寫回的內容也會一併備份
+            with get_db_connection() as src, sqlite3.connect(backup_filename) as dst:
+                src.backup(dst)
             print(f"📦 自動備份完成: {backup_filename}")
         except Exception as e:
             print(f"⚠️ 備份失敗: {e}")
 
 
+@contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """
+    跨程序檔案鎖 (POSIX 使用 fcntl，Windows 使用 msvcrt)
+    blocking=False 時不等待，取得與否以 yield 的布林值回報
+    """
+    with open(path, "a+b") as f:
+        try:
+            if os.name == "nt":
+                import msvcrt
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            if blocking:
+                raise
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if os.name == "nt":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def run_startup_tasks():
+    """
+    啟動任務 (備份 + 遷移) 的多程序保護
+    - 由 main.py 啟動的多 worker 模式：主程序執行一次後設定環境變數，子程序直接略過
+    - 直接以 `uvicorn main:app --workers N` 啟動：各 worker 透過檔案鎖依序執行 (遷移皆為冪等)
+    """
+    if os.environ.get(STARTUP_DONE_ENV) == "1":
+        return
+    with file_lock(f"{DB_NAME}.lock"):
+        init_db()
+    os.environ[STARTUP_DONE_ENV] = "1"
+
+
 def init_db():
     """初始化資料庫：建立所有必要的資料表與結構遷移"""
     backup_db()
@@ -35,6 +87,9 @@ def init_db():
     with get_db_connection() as conn:
         cursor = conn.cursor()
 
+        # WAL 模式：寫入時其他 worker 仍可同時讀取
+        cursor.execute("PRAGMA journal_mode=WAL")
+
         # --- 1. 工作日誌系統 ---
         cursor.execute('''CREATE TABLE IF NOT EXISTS daily_logs
                           (
@@ -77,6 +132,8 @@ def init_db():
             TEXT, -- ✅ 新增：父層 ID
             relation_type
             TEXT, -- ✅ 新增：關係類型 (inherit/evolve)
+            deleted_at
+            TEXT, -- 墓碑時間 (軟刪除，由背景壓縮清除)
             FOREIGN
             KEY
                           (
@@ -104,6 +161,21 @@ def init_db():
             cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_log_items_item_id ON log_items(item_id)")
             print("🔧 資料庫更新：已新增 item_id 欄位")
 
+        # item_id 唯一索引：save_log 的 INSERT OR REPLACE 依賴它覆蓋同 ID 列
+        # 舊版只在遷移分支建立，全新資料庫會缺少索引而累積重複列；建立前先保留每個 item_id 最新的一列
+        deduped = 0
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'idx_log_items_item_id'")
+        if cursor.fetchone() is None:
+            cursor.execute('''
+                           DELETE FROM log_items
+                           WHERE item_id IS NOT NULL
+                             AND id NOT IN (SELECT MAX(id) FROM log_items WHERE item_id IS NOT NULL GROUP BY item_id)
+                           ''')
+            deduped = cursor.rowcount
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_log_items_item_id ON log_items(item_id)")
+            if deduped:
+                print(f"🔧 資料庫更新：已清除 {deduped} 筆重複的 item_id 並建立唯一索引")
+
         # 3. 檢查專案進化樹欄位 (本次新增)
         try:
             cursor.execute("SELECT origin_id FROM log_items LIMIT 1")
@@ -117,6 +189,18 @@ def init_db():
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_log_items_origin_id ON log_items(origin_id)")
             print("🔧 資料庫更新：已啟用專案進化樹 (origin/parent/relation)")
 
+        # 4. 檢查軟刪除 (墓碑) 欄位
+        try:
+            cursor.execute("SELECT deleted_at FROM log_items LIMIT 1")
+        except sqlite3.OperationalError:
+            cursor.execute("ALTER TABLE log_items ADD COLUMN deleted_at TEXT")
+            print("🔧 資料庫更新：已啟用軟刪除 (deleted_at)")
+
+        # 墓碑只佔少數：部分索引讓壓縮作業不必掃描整張表；parent_id 索引供孤兒重新掛載使用
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_log_items_tombstone ON log_items(deleted_at) WHERE deleted_at IS NOT NULL")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_log_items_parent_id ON log_items(parent_id)")
+
         # --- 2. 原子習慣定義表 ---
         cursor.execute('''CREATE TABLE IF NOT EXISTS habit_definitions
                           (
@@ -146,9 +230,16 @@ def init_db():
                               sort_order
                               INTEGER
                               DEFAULT
-                              0
+                              0,
+                              deleted_at
+                              TEXT
                           )''')
 
+        try:
+            cursor.execute("SELECT deleted_at FROM habit_definitions LIMIT 1")
+        except sqlite3.OperationalError:
+            cursor.execute("ALTER TABLE habit_definitions ADD COLUMN deleted_at TEXT")
+
         # --- 3. 原子習慣紀錄表 ---
         cursor.execute('''CREATE TABLE IF NOT EXISTS habit_logs
         (
@@ -157,7 +248,7 @@ def init_db():
             PRIMARY
             KEY
             AUTOINCREMENT,
-            date
+            log_date
             TEXT,
             habit_id
             INTEGER,
@@ -172,6 +263,24 @@ def init_db():
                               id
                           ))''')
 
+        # 舊版建表使用 `date` 欄位，但查詢與 ON CONFLICT 皆使用 log_date
+        try:
+            cursor.execute("SELECT log_date FROM habit_logs LIMIT 1")
+        except sqlite3.OperationalError:
+            cursor.execute("ALTER TABLE habit_logs RENAME COLUMN date TO log_date")
+            print("🔧 資料庫更新：habit_logs.date 已更名為 log_date")
+
+        # (log_date, habit_id) 唯一索引：打卡的 ON CONFLICT upsert 依賴它；建立前先保留每組最新的一列
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'idx_habit_logs_date_habit'")
+        if cursor.fetchone() is None:
+            cursor.execute('''
+                           DELETE FROM habit_logs
+                           WHERE id NOT IN (SELECT MAX(id) FROM habit_logs GROUP BY log_date, habit_id)
+                           ''')
+            if cursor.rowcount:
+                print(f"🔧 資料庫更新：已清除 {cursor.rowcount} 筆重複的習慣打卡紀錄")
+            cursor.execute("CREATE UNIQUE INDEX idx_habit_logs_date_habit ON habit_logs(log_date, habit_id)")
+
         # --- 4. 習慣群組表 ---
         cursor.execute('''CREATE TABLE IF NOT EXISTS habit_groups
                           (
@@ -190,4 +299,31 @@ def init_db():
                               0
                           )''')
 
-        conn.commit()
\ No newline at end of file
+        # --- 5. 統計彙總表 (日/週/月 × 全部/標籤/專案家族) ---
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'stats_rollups'")
+        has_rollups = cursor.fetchone() is not None
+
+        cursor.execute('''CREATE TABLE IF NOT EXISTS stats_rollups
+                          (
+                              granularity TEXT,
+                              bucket      TEXT,
+                              dimension   TEXT,
+                              dim_key     TEXT,
+                              done        INTEGER DEFAULT 0,
+                              undone      INTEGER DEFAULT 0,
+                              PRIMARY KEY (granularity, dimension, dim_key, bucket)
+                          )''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_stats_rollups_bucket ON stats_rollups(granularity, dimension, bucket)")
+
+        if not has_rollups or deduped:
+            rebuild_rollups(cursor)
+            print("🔧 資料庫更新：已建立統計彙總表並回填歷史資料")
+
+        conn.commit()
+
+        # --- 6. 增量回收空間 (incremental_vacuum 需要 auto_vacuum=INCREMENTAL，切換時須完整 VACUUM 一次) ---
+        cursor.execute("PRAGMA auto_vacuum")
+        if cursor.fetchone()[0] != 2:
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("VACUUM")
+            print("🔧 資料庫更新：已啟用 incremental auto_vacuum")
\ No newline at end of file
@@ -1,15 +1,32 @@
 # main.py
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import Response
-from database import init_db
-from routers import logs, habits, project  # ✅ 新增 project
+from database import run_startup_tasks
+from compaction import start_compactor
+from routers import logs, habits, project, stats, bootstrap
 
-app = FastAPI()
+# 部署設定 (可用環境變數或命令列參數覆寫)
+HOST = os.environ.get("DAILY_LOGGER_HOST", "127.0.0.1")
+PORT = int(os.environ.get("DAILY_LOGGER_PORT", "8000"))
+WORKERS = int(os.environ.get("DAILY_LOGGER_WORKERS", "1"))
 
-# 初始化資料庫
-init_db()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 背景墓碑壓縮 (多 worker 時以檔案鎖確保同一時間只有一個在跑)
+    stop = start_compactor()
+    yield
+    stop.set()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# 初始化資料庫 (多 worker 時只會由一個程序執行備份與遷移)
+run_startup_tasks()
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,9 +43,44 @@ async def favicon():
 app.include_router(logs.router)
 app.include_router(habits.router)
 app.include_router(project.router)  # ✅ 掛載專案地圖 API
+app.include_router(stats.router)  # 生產力統計儀表板 API
+app.include_router(bootstrap.router)  # 首次載入合併 API
 
 app.mount("/", StaticFiles(directory="static", html=True), name="static")
 
+
+def start_writer():
+    """
+    啟動單一寫入協調器程序，並將位址與金鑰透過環境變數交給各 worker
+    協調器不會被自動重啟：程序結束後所有寫入都會失敗，需重新啟動服務
+    """
+    import multiprocessing
+    import secrets
+    import writer
+
+    authkey = secrets.token_bytes(16)
+    parent_end, child_end = multiprocessing.Pipe(duplex=False)
+    proc = multiprocessing.Process(target=writer.serve, args=(child_end, authkey), daemon=True)
+    proc.start()
+
+    os.environ[writer.WRITER_ADDRESS_ENV] = parent_end.recv()
+    os.environ[writer.WRITER_KEY_ENV] = authkey.hex()
+    return proc
+
+
 if __name__ == "__main__":
+    import argparse
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
+
+    parser = argparse.ArgumentParser(description="Daily Logger")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # 多 worker：讀取由各 worker 直接處理，寫入統一送往協調器
+        start_writer()
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
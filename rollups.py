@@ -0,0 +1,126 @@
+"""
+生產力統計彙總表 (Rollup Tables)
+維護 日 / 週 / 月 三種時間桶的完成數統計，並依「標籤」與「專案家族 (origin)」分維度累計。
+寫入路徑 (save_log、專案地圖操作) 以「先扣除舊列、再加回新列」的方式增量更新。
+"""
+from datetime import date
+
+GRANULARITIES = ("day", "week", "month")
+DIMENSIONS = ("all", "tag", "origin")
+
+# 讀取原始列時統一使用的欄位 (origin 家族：沒有 origin_id 的任務自己就是始祖)
+ROW_COLUMNS = '''dl.log_date,
+                 li.tags,
+                 li.is_done,
+                 COALESCE(li.origin_id, li.item_id) AS origin_key'''
+
+
+def bucket_key(granularity: str, date_str: str) -> str:
+    """將 YYYY-MM-DD 轉換為對應時間桶的鍵值 (可直接做字串範圍比較)"""
+    if granularity == "day":
+        return date_str[:10]
+    if granularity == "month":
+        return date_str[:7]
+    if granularity == "week":
+        year, week, _ = date.fromisoformat(date_str[:10]).isocalendar()
+        return f"{year}-W{week:02d}"
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def _row_keys(row):
+    """
+    列出單筆任務會影響的所有 (granularity, bucket, dimension, key) 組合
+    日期無法解析的列 (例如清空日期欄位後存下的 "") 不計入統計，避免舊資料讓回填或儲存失敗
+    """
+    try:
+        buckets = [(g, bucket_key(g, row["log_date"])) for g in GRANULARITIES]
+    except (TypeError, ValueError):
+        return
+
+    dims = [("all", "")]
+    for tag in set((row["tags"] or "").split()):
+        dims.append(("tag", tag))
+    if row["origin_key"]:
+        dims.append(("origin", row["origin_key"]))
+
+    for g, bucket in buckets:
+        for dim, key in dims:
+            yield g, bucket, dim, key
+
+
+def _aggregate(rows, sign=1):
+    """將原始列彙總成 {(granularity, bucket, dimension, key): [done, undone]}"""
+    deltas = {}
+    for row in rows:
+        is_done = 1 if row["is_done"] else 0
+        for k in _row_keys(row):
+            d = deltas.setdefault(k, [0, 0])
+            d[0] += sign * is_done
+            d[1] += sign * (1 - is_done)
+    return deltas
+
+
+def fetch_rows(cursor, where: str, params=()):
+    """依條件讀取 log_items 原始列 (含日期與 origin 家族，已標記墓碑的列不計入)"""
+    cursor.execute(f'''SELECT {ROW_COLUMNS}
+                       FROM log_items li
+                                JOIN daily_logs dl ON li.log_id = dl.id
+                       WHERE li.deleted_at IS NULL
+                         AND ({where})''', tuple(params))
+    return cursor.fetchall()
+
+
+def apply_rows(cursor, rows, sign=1):
+    """
+    增量更新彙總表：sign=1 表示新增列，sign=-1 表示移除列
+    歸零的桶會一併清掉，讓彙總表與原始資料保持同樣的稀疏度
+    """
+    deltas = {k: v for k, v in _aggregate(rows, sign).items() if v != [0, 0]}
+    if not deltas:
+        return
+
+    cursor.executemany('''
+                       INSERT INTO stats_rollups (granularity, bucket, dimension, dim_key, done, undone)
+                       VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(granularity, bucket, dimension, dim_key) DO
+                       UPDATE SET done = done + excluded.done, undone = undone + excluded.undone
+                       ''', [(*k, v[0], v[1]) for k, v in deltas.items()])
+
+    if sign < 0:
+        cursor.executemany('''
+                           DELETE FROM stats_rollups
+                           WHERE granularity = ? AND bucket = ? AND dimension = ? AND dim_key = ?
+                             AND done = 0 AND undone = 0
+                           ''', list(deltas.keys()))
+
+
+def rebuild_rollups(cursor):
+    """從 log_items 原始列完整重建彙總表"""
+    cursor.execute("DELETE FROM stats_rollups")
+    apply_rows(cursor, fetch_rows(cursor, "1 = 1"))
+
+
+def check_rollups(cursor):
+    """
+    一致性檢查：以原始列重新計算，與彙總表逐桶比對
+    回傳不一致的桶清單 (空清單代表一致)
+    """
+    expected = {k: v for k, v in _aggregate(fetch_rows(cursor, "1 = 1")).items() if v != [0, 0]}
+
+    cursor.execute("SELECT granularity, bucket, dimension, dim_key, done, undone FROM stats_rollups")
+    actual = {(r["granularity"], r["bucket"], r["dimension"], r["dim_key"]): [r["done"], r["undone"]]
+              for r in cursor.fetchall() if r["done"] or r["undone"]}
+
+    mismatches = []
+    for k in sorted(set(expected) | set(actual)):
+        exp, act = expected.get(k, [0, 0]), actual.get(k, [0, 0])
+        if exp != act:
+            g, bucket, dim, key = k
+            mismatches.append({
+                "granularity": g,
+                "bucket": bucket,
+                "dimension": dim,
+                "key": key,
+                "expected": {"done": exp[0], "undone": exp[1]},
+                "actual": {"done": act[0], "undone": act[1]}
+            })
+    return mismatches
@@ -0,0 +1,30 @@
+# routers/bootstrap.py
+from fastapi import APIRouter
+from database import get_db_connection
+from routers.habits import get_habits
+from routers.logs import get_log
+
+router = APIRouter(tags=["bootstrap"])
+
+
+@router.get("/bootstrap")
+async def bootstrap(date: str):
+    """
+    首次載入 (與切換日期) 專用：一次回傳當日日誌、習慣與習慣群組
+    取代前端原本分開發出的 /get-log 與 /get-habits
+    """
+    log = await get_log(date)
+    habits = await get_habits(date)
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name, sort_order FROM habit_groups ORDER BY sort_order ASC, id ASC")
+        groups = [{"id": r["id"], "name": r["name"], "sort_order": r["sort_order"]} for r in cursor.fetchall()]
+
+    return {
+        "status": "success",
+        "date": date,
+        "items": log["items"],
+        "habits": habits["habits"],
+        "groups": groups
+    }
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException
-from database import get_db_connection
+from fastapi.concurrency import run_in_threadpool
+from database import get_db_connection, now_stamp
 from models import HabitCreate, HabitLogReq, HabitUpdate
+from writer import run_write
 import sqlite3
 
 router = APIRouter(tags=["habits"])
@@ -16,6 +18,7 @@ async def get_habits(date: str):
                        FROM habit_definitions h
                                 LEFT JOIN habit_logs l ON h.id = l.habit_id AND l.log_date = ?
                        WHERE h.is_archived = 0
+                         AND h.deleted_at IS NULL
                        ORDER BY h.sort_order ASC, h.created_at ASC
                        ''', (date,))
         rows = cursor.fetchall()
@@ -34,87 +37,89 @@ async def get_habits(date: str):
 
 
 # 2. 新增習慣
+def _add_habit_tx(cursor, habit: HabitCreate):
+    cursor.execute(
+        "INSERT INTO habit_definitions (title, color, group_id) VALUES (?, ?, ?)",
+        (habit.title, habit.color, habit.group_id or 0)
+    )
+
+
 @router.post("/add-habit")
 async def add_habit(habit: HabitCreate):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO habit_definitions (title, color, group_id) VALUES (?, ?, ?)",
-            (habit.title, habit.color, habit.group_id or 0)
-        )
-        conn.commit()
+    await run_in_threadpool(run_write, _add_habit_tx, habit)
     return {"status": "success"}
 
 
 # 3. 打卡
+def _toggle_habit_tx(cursor, log: HabitLogReq):
+    cursor.execute('''
+                   INSERT INTO habit_logs (log_date, habit_id, status)
+                   VALUES (?, ?, ?) ON CONFLICT(log_date, habit_id) DO
+                   UPDATE SET status=excluded.status
+                   ''', (log.date, log.habit_id, log.status))
+
+
 @router.post("/toggle-habit")
 async def toggle_habit(log: HabitLogReq):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-                       INSERT INTO habit_logs (log_date, habit_id, status)
-                       VALUES (?, ?, ?) ON CONFLICT(log_date, habit_id) DO
-                       UPDATE SET status=excluded.status
-                       ''', (log.date, log.habit_id, log.status))
-        conn.commit()
+    await run_in_threadpool(run_write, _toggle_habit_tx, log)
     return {"status": "success"}
 
 
 # 4. 一鍵全亮
+def _mark_all_done_tx(cursor, date: str):
+    cursor.execute("SELECT id FROM habit_definitions WHERE is_archived = 0 AND deleted_at IS NULL")
+    habits = cursor.fetchall()
+    for h in habits:
+        cursor.execute('''
+                       INSERT INTO habit_logs (log_date, habit_id, status)
+                       VALUES (?, ?, 1) ON CONFLICT(log_date, habit_id) DO
+                       UPDATE SET status=1
+                       ''', (date, h["id"]))
+
+
 @router.post("/mark-all-done")
 async def mark_all_done(date: str):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id FROM habit_definitions WHERE is_archived = 0")
-        habits = cursor.fetchall()
-        for h in habits:
-            cursor.execute('''
-                           INSERT INTO habit_logs (log_date, habit_id, status)
-                           VALUES (?, ?, 1) ON CONFLICT(log_date, habit_id) DO
-                           UPDATE SET status=1
-                           ''', (date, h["id"]))
-        conn.commit()
+    await run_in_threadpool(run_write, _mark_all_done_tx, date)
     return {"status": "success"}
 
 
 # 5. 修改習慣 (包含 group_id 更新)
+def _update_habit_tx(cursor, habit: HabitUpdate):
+    # 動態建立 SQL，支援 title, color, is_archived, group_id 的更新
+    fields = []
+    values = []
+
+    if habit.title is not None:
+        fields.append("title = ?")
+        values.append(habit.title)
+    if habit.color is not None:
+        fields.append("color = ?")
+        values.append(habit.color)
+    if habit.group_id is not None:
+        fields.append("group_id = ?")
+        values.append(habit.group_id)
+    if habit.is_archived is not None:
+        fields.append("is_archived = ?")
+        values.append(1 if habit.is_archived else 0)
+
+    if fields:
+        values.append(habit.habit_id)  # WHERE 條件的參數
+        sql = f"UPDATE habit_definitions SET {', '.join(fields)} WHERE id = ?"
+        cursor.execute(sql, tuple(values))
+
+
 @router.post("/update-habit")
 async def update_habit(habit: HabitUpdate):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+    await run_in_threadpool(run_write, _update_habit_tx, habit)
+    return {"status": "success"}
 
-        # 動態建立 SQL，支援 title, color, is_archived, group_id 的更新
-        fields = []
-        values = []
-
-        if habit.title is not None:
-            fields.append("title = ?")
-            values.append(habit.title)
-        if habit.color is not None:
-            fields.append("color = ?")
-            values.append(habit.color)
-        if habit.group_id is not None:
-            fields.append("group_id = ?")
-            values.append(habit.group_id)
-        if habit.is_archived is not None:
-            fields.append("is_archived = ?")
-            values.append(1 if habit.is_archived else 0)
-
-        if fields:
-            values.append(habit.habit_id)  # WHERE 條件的參數
-            sql = f"UPDATE habit_definitions SET {', '.join(fields)} WHERE id = ?"
-            cursor.execute(sql, tuple(values))
-            conn.commit()
 
-    return {"status": "success"}
+# 6. 刪除習慣 (標記墓碑；打卡紀錄由背景壓縮分批清除)
+def _delete_habit_tx(cursor, habit_id: int):
+    cursor.execute("UPDATE habit_definitions SET deleted_at = ? WHERE id = ?", (now_stamp(), habit_id))
 
 
-# 6. 刪除習慣
 @router.delete("/delete-habit/{habit_id}")
 async def delete_habit(habit_id: int):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM habit_definitions WHERE id = ?", (habit_id,))
-        cursor.execute("DELETE FROM habit_logs WHERE habit_id = ?", (habit_id,))
-        conn.commit()
+    await run_in_threadpool(run_write, _delete_habit_tx, habit_id)
     return {"status": "success"}
\ No newline at end of file
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional
-from database import get_db_connection
+from database import get_db_connection, now_stamp
 from models import DayLog
+from rollups import fetch_rows, apply_rows
+from writer import run_write
 import sqlite3
 import uuid
 
@@ -20,6 +23,7 @@ def export_month_to_txt(date_str: str):
                        FROM daily_logs dl
                                 JOIN log_items li ON dl.id = li.log_id
                        WHERE dl.log_date LIKE ?
+                         AND li.deleted_at IS NULL
                        ORDER BY dl.log_date DESC, li.sort_order ASC
                        ''', (f"{month_prefix}%",))
         rows = cursor.fetchall()
@@ -72,6 +76,7 @@ async def get_log(date_str: str):
                               relation_type
                        FROM log_items
                        WHERE log_id = ?
+                         AND deleted_at IS NULL
                        ORDER BY sort_order ASC
                        ''', (log_id,))
         items = cursor.fetchall()
@@ -95,51 +100,58 @@ async def get_log(date_str: str):
         }
 
 
+def _save_log_tx(cursor, request: DayLog):
+    """save_log 的寫入交易 (由寫入協調器或本程序執行)"""
+    # 1. 確保 Daily Log 存在
+    cursor.execute("INSERT OR IGNORE INTO daily_logs (log_date) VALUES (?)", (request.date,))
+    cursor.execute("SELECT id FROM daily_logs WHERE log_date = ?", (request.date,))
+    log_id = cursor.fetchone()['id']
+
+    # 2. 獲取現有 item_ids 以便清理刪除項
+    cursor.execute("SELECT item_id FROM log_items WHERE log_id = ? AND deleted_at IS NULL", (log_id,))
+    existing_ids = {row['item_id'] for row in cursor.fetchall() if row['item_id']}
+    incoming_ids = {item.item_id for item in request.items if item.item_id}
+
+    # 統計彙總：先扣除本日舊列 (以及將被 REPLACE 覆蓋的同 ID 列)
+    placeholders = ','.join(['?'] * len(incoming_ids))
+    where = f"li.log_id = ? OR li.item_id IN ({placeholders})" if incoming_ids else "li.log_id = ?"
+    apply_rows(cursor, fetch_rows(cursor, where, (log_id, *incoming_ids)), sign=-1)
+
+    # 3. 前端已移除的項目改為標記墓碑 (實際清除交給背景壓縮)
+    ids_to_delete = existing_ids - incoming_ids
+    if ids_to_delete:
+        cursor.execute(f"UPDATE log_items SET deleted_at = ? WHERE item_id IN ({','.join(['?'] * len(ids_to_delete))})",
+                       (now_stamp(), *ids_to_delete))
+
+    # 4. UPSERT 更新或插入
+    for idx, item in enumerate(request.items):
+        uid = item.item_id or str(uuid.uuid4())
+
+        cursor.execute('''
+            INSERT OR REPLACE INTO log_items 
+            (item_id, log_id, title, content, is_done, sort_order, tags, origin_id, parent_id, relation_type) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            uid,
+            log_id,
+            item.title,
+            item.content,
+            item.isDone,
+            idx,
+            item.tags,
+            item.origin_id,
+            item.parent_id,
+            item.relation_type
+        ))
+
+    # 5. 統計彙總：加回本日最新內容
+    apply_rows(cursor, fetch_rows(cursor, "li.log_id = ?", (log_id,)))
+
+
 @router.post("/save-log")
 async def save_log(request: DayLog):
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            # 1. 確保 Daily Log 存在
-            cursor.execute("INSERT OR IGNORE INTO daily_logs (log_date) VALUES (?)", (request.date,))
-            cursor.execute("SELECT id FROM daily_logs WHERE log_date = ?", (request.date,))
-            log_id = cursor.fetchone()['id']
-
-            # 2. 獲取現有 item_ids 以便清理刪除項
-            cursor.execute("SELECT item_id FROM log_items WHERE log_id = ?", (log_id,))
-            existing_ids = {row['item_id'] for row in cursor.fetchall() if row['item_id']}
-            incoming_ids = {item.item_id for item in request.items if item.item_id}
-
-            # 3. 刪除前端已移除的項目
-            ids_to_delete = existing_ids - incoming_ids
-            if ids_to_delete:
-                cursor.execute(f"DELETE FROM log_items WHERE item_id IN ({','.join(['?'] * len(ids_to_delete))})",
-                               tuple(ids_to_delete))
-
-            # 4. UPSERT 更新或插入
-            for idx, item in enumerate(request.items):
-                uid = item.item_id or str(uuid.uuid4())
-
-                cursor.execute('''
-                    INSERT OR REPLACE INTO log_items 
-                    (item_id, log_id, title, content, is_done, sort_order, tags, origin_id, parent_id, relation_type) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    uid,
-                    log_id,
-                    item.title,
-                    item.content,
-                    item.isDone,
-                    idx,
-                    item.tags,
-                    item.origin_id,
-                    item.parent_id,
-                    item.relation_type
-                ))
-
-            conn.commit()
-
+        await run_in_threadpool(run_write, _save_log_tx, request)
         export_month_to_txt(request.date)
         return {"status": "success", "message": "Log saved"}
 
@@ -162,6 +174,7 @@ async def get_all_logs():
                                  li.relation_type
                           FROM daily_logs dl
                                    JOIN log_items li ON dl.id = li.log_id
+                          WHERE li.deleted_at IS NULL
                           ORDER BY dl.log_date DESC, li.sort_order ASC''')
         rows = cursor.fetchall()
 
@@ -191,6 +204,7 @@ async def get_project_history(title: str, tags: Optional[str] = None):
                 FROM log_items li
                          JOIN daily_logs dl ON li.log_id = dl.id
                 WHERE li.title = ? \
+                  AND li.deleted_at IS NULL \
                 '''
         params = [title]
         if tags:
@@ -1,8 +1,11 @@
 # routers/project.py
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional, List
-from database import get_db_connection
+from database import get_db_connection, now_stamp
+from rollups import fetch_rows, apply_rows
+from writer import run_write
 import uuid  # ✅ 確保匯入 UUID
 
 # 設定路由前綴為 /project，這樣 API 路徑就會是 /project/tree/...
@@ -49,8 +52,8 @@ async def get_project_tree(origin_id: str):
                        dl.log_date
                 FROM log_items li
                          JOIN daily_logs dl ON li.log_id = dl.id
-                WHERE li.origin_id = ? \
-                   OR li.item_id = ?
+                WHERE (li.origin_id = ? OR li.item_id = ?) \
+                  AND li.deleted_at IS NULL
                 ORDER BY dl.log_date ASC, li.sort_order ASC \
                 '''
 
@@ -76,6 +79,16 @@ async def get_project_tree(origin_id: str):
         return {"status": "success", "origin_id": origin_id, "tree": tree_nodes}
 
 
+def _update_relation_tx(cursor, req: RelationUpdateReq):
+    # 更新 parent_id 與 relation_type
+    cursor.execute('''
+                   UPDATE log_items
+                   SET parent_id     = ?,
+                       relation_type = ?
+                   WHERE item_id = ?
+                   ''', (req.target_parent_id, req.relation_type, req.item_id))
+
+
 @router.patch("/update-relation")
 async def update_task_relation(req: RelationUpdateReq):
     """
@@ -86,19 +99,11 @@ async def update_task_relation(req: RelationUpdateReq):
             cursor = conn.cursor()
 
             # 驗證 item_id 是否存在
-            cursor.execute("SELECT id FROM log_items WHERE item_id = ?", (req.item_id,))
+            cursor.execute("SELECT id FROM log_items WHERE item_id = ? AND deleted_at IS NULL", (req.item_id,))
             if not cursor.fetchone():
                 raise HTTPException(status_code=404, detail="Item not found")
 
-            # 更新 parent_id 與 relation_type
-            cursor.execute('''
-                           UPDATE log_items
-                           SET parent_id     = ?,
-                               relation_type = ?
-                           WHERE item_id = ?
-                           ''', (req.target_parent_id, req.relation_type, req.item_id))
-
-            conn.commit()
+        await run_in_threadpool(run_write, _update_relation_tx, req)
 
         return {"status": "success", "message": "Relation updated"}
 
@@ -107,6 +112,22 @@ async def update_task_relation(req: RelationUpdateReq):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _add_milestone_tx(cursor, req: CreateMilestoneReq, new_id: str):
+    # 1. 確保 daily_logs 存在
+    cursor.execute("INSERT OR IGNORE INTO daily_logs (log_date) VALUES (?)", (req.date,))
+    cursor.execute("SELECT id FROM daily_logs WHERE log_date = ?", (req.date,))
+    log_id_row = cursor.fetchone()
+    log_id = log_id_row['id']
+
+    # 2. 建立里程碑任務
+    cursor.execute('''
+                   INSERT INTO log_items
+                   (item_id, log_id, title, is_done, sort_order, origin_id, parent_id, relation_type)
+                   VALUES (?, ?, ?, 0, 999, ?, ?, 'evolve')
+                   ''', (new_id, log_id, req.title, req.origin_id, req.origin_id))
+    apply_rows(cursor, fetch_rows(cursor, "li.item_id = ?", (new_id,)))
+
+
 @router.post("/add-milestone")
 async def add_milestone(req: CreateMilestoneReq):
     """
@@ -114,23 +135,7 @@ async def add_milestone(req: CreateMilestoneReq):
     """
     try:
         new_id = str(uuid.uuid4())
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            # 1. 確保 daily_logs 存在
-            cursor.execute("INSERT OR IGNORE INTO daily_logs (log_date) VALUES (?)", (req.date,))
-            cursor.execute("SELECT id FROM daily_logs WHERE log_date = ?", (req.date,))
-            log_id_row = cursor.fetchone()
-            log_id = log_id_row['id']
-
-            # 2. 建立里程碑任務
-            cursor.execute('''
-                           INSERT INTO log_items
-                           (item_id, log_id, title, is_done, sort_order, origin_id, parent_id, relation_type)
-                           VALUES (?, ?, ?, 0, 999, ?, ?, 'evolve')
-                           ''', (new_id, log_id, req.title, req.origin_id, req.origin_id))
-
-            conn.commit()
+        await run_in_threadpool(run_write, _add_milestone_tx, req, new_id)
 
         return {"status": "success", "item_id": new_id}
 
@@ -139,17 +144,20 @@ async def add_milestone(req: CreateMilestoneReq):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# ✅ 新增：物理刪除 API
+def _delete_item_tx(cursor, item_id: str):
+    apply_rows(cursor, fetch_rows(cursor, "li.item_id = ?", (item_id,)), sign=-1)
+    cursor.execute("UPDATE log_items SET deleted_at = ? WHERE item_id = ? AND deleted_at IS NULL",
+                   (now_stamp(), item_id))
+
+
+# ✅ 新增：刪除 API
 @router.delete("/item/{item_id}")
 async def delete_project_item(item_id: str):
     """
-    物理刪除指定的任務或里程碑
+    刪除指定的任務或里程碑 (標記墓碑；子節點的 parent_id 由背景壓縮統一重新掛載)
     """
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM log_items WHERE item_id = ?", (item_id,))
-            conn.commit()
+        await run_in_threadpool(run_write, _delete_item_tx, item_id)
 
         return {"status": "success", "message": "Item deleted"}
 
@@ -0,0 +1,79 @@
+# routers/stats.py
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from datetime import date
+from typing import Optional
+from database import get_db_connection
+from rollups import GRANULARITIES, DIMENSIONS, bucket_key, check_rollups, rebuild_rollups
+from writer import run_write
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("")
+async def get_stats(start: str, end: str, granularity: str = "day", dimension: str = "all",
+                    key: Optional[str] = None):
+    """
+    儀表板統計：直接讀取彙總表，每個時間桶只需一次索引查詢
+    - granularity: day / week / month
+    - dimension: all / tag / origin (key 可指定單一標籤或專案家族)
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {GRANULARITIES}")
+    if dimension not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"dimension must be one of {DIMENSIONS}")
+
+    try:
+        date.fromisoformat(start)
+        date.fromisoformat(end)
+        lo, hi = bucket_key(granularity, start), bucket_key(granularity, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        query = '''
+                SELECT bucket, dim_key, done, undone
+                FROM stats_rollups
+                WHERE granularity = ?
+                  AND dimension = ? \
+                '''
+        params = [granularity, dimension]
+        if key is not None:
+            query += " AND dim_key = ?"
+            params.append(key)
+        query += " AND bucket BETWEEN ? AND ? ORDER BY bucket ASC, dim_key ASC"
+        params.extend([lo, hi])
+
+        cursor.execute(query, tuple(params))
+        rows = cursor.fetchall()
+
+    return {
+        "status": "success",
+        "granularity": granularity,
+        "dimension": dimension,
+        "buckets": [
+            {
+                "bucket": r["bucket"],
+                "key": r["dim_key"],
+                "done": r["done"],
+                "undone": r["undone"]
+            }
+            for r in rows
+        ]
+    }
+
+
+@router.get("/check")
+async def check_stats():
+    """一致性檢查：以原始日誌重新計算並與彙總表比對"""
+    with get_db_connection() as conn:
+        mismatches = check_rollups(conn.cursor())
+    return {"status": "success", "consistent": not mismatches, "mismatches": mismatches}
+
+
+@router.post("/rebuild")
+async def rebuild_stats():
+    """從原始日誌完整重建彙總表"""
+    await run_in_threadpool(run_write, rebuild_rollups)
+    return {"status": "success", "message": "Rollups rebuilt"}
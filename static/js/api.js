@@ -1,4 +1,11 @@
-const API_BASE = "http://127.0.0.1:8000";
+const API_BASE = window.location.origin;  // 跟隨伺服器實際的 host/port
+
+// --- 首次載入 ---
+// 一次取回當日日誌、習慣與群組 (取代分開的 get-log + get-habits)
+async function apiBootstrap(date) {
+    const res = await fetch(`${API_BASE}/bootstrap?date=${date}`, { cache: "no-store" });
+    return await res.json();
+}
 
 // --- 日誌相關 ---
 async function apiGetLog(date) {
@@ -33,15 +40,6 @@ async function apiGetHabits(date) {
     return await res.json();
 }
 
-async function apiAddHabit(habitData) {
-    const res = await fetch(`${API_BASE}/add-habit`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(habitData)
-    });
-    return await res.json();
-}
-
 async function apiToggleHabit(date, habitId, status) {
     const res = await fetch(`${API_BASE}/toggle-habit`, {
         method: 'POST',
@@ -55,23 +53,3 @@ async function apiMarkAllHabitsDone(date) {
     const res = await fetch(`${API_BASE}/mark-all-done?date=${date}`, { method: 'POST' });
     return await res.json();
 }
-
-// [更新] 支援 title, color, group_id, is_archived 任意組合
-async function apiUpdateHabit(id, { title, color, group_id }) {
-    const payload = { habit_id: id };
-    if (title !== undefined) payload.title = title;
-    if (color !== undefined) payload.color = color;
-    if (group_id !== undefined) payload.group_id = group_id;
-
-    const res = await fetch(`${API_BASE}/update-habit`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload)
-    });
-    return await res.json();
-}
-
-async function apiDeleteHabit(id) {
-    const res = await fetch(`${API_BASE}/delete-habit/${id}`, { method: 'DELETE' });
-    return await res.json();
-}
\ No newline at end of file
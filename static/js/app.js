@@ -2,6 +2,7 @@
  * Daily Logger v2.6 - Project Map Integration
  * Features: Auto-save, UUID, Morphing UI, Tag Capsules, Auto-sorting.
  * New: Project Inheritance, Evolution Logic, and DNA Map Trigger.
+ * Startup: 單一 /bootstrap 請求完成首屏；專案地圖、習慣設定與 Sortable.js 皆於需要時才載入。
  */
 
 let container;
@@ -19,16 +20,39 @@ const generateUUID = () => {
     });
 };
 
+// --- 延遲載入模組 ---
+const LAZY_MODULES = {
+    sortable: { src: 'https://cdn.jsdelivr.net/npm/sortablejs@1.15.0/Sortable.min.js' },
+    habit_settings: { src: 'js/habit_settings.js', deps: ['sortable'] },
+    project_map: { src: 'js/project_map.js', deps: ['sortable'] }
+};
+const moduleCache = {};
+
+function loadModule(name) {
+    if (!moduleCache[name]) {
+        const mod = LAZY_MODULES[name];
+        moduleCache[name] = Promise.all((mod.deps || []).map(loadModule)).then(() => new Promise((resolve, reject) => {
+            const script = document.createElement('script');
+            script.src = mod.src;
+            script.onload = resolve;
+            script.onerror = () => {
+                delete moduleCache[name];
+                reject(new Error(`Failed to load module: ${name}`));
+            };
+            document.head.appendChild(script);
+        }));
+    }
+    return moduleCache[name];
+}
+
+async function openProjectMap(originId) {
+    await loadModule('project_map');
+    return showProjectMap(originId);
+}
+
 window.onload = async () => {
     container = document.getElementById('todo-container');
     if (container) {
-        new Sortable(container, {
-            animation: 300,
-            handle: '.drag-handle',
-            ghostClass: 'ghost',
-            onEnd: () => triggerAutoSave()
-        });
-
         container.addEventListener('input', (e) => {
             if (!e.target.classList.contains('ghost-tag-input')) {
                 isModified = true;
@@ -45,19 +69,44 @@ window.onload = async () => {
 
     transformSaveButtonToStatus();
 
+    await loadDay(localDate);
+
+    // 拖曳排序不影響首屏：畫面完成後才載入 Sortable.js
+    if (container) {
+        loadModule('sortable').then(() => new Sortable(container, {
+            animation: 300,
+            handle: '.drag-handle',
+            ghostClass: 'ghost',
+            onEnd: () => triggerAutoSave()
+        }));
+    }
+};
+
+// 一次請求取回當日日誌與習慣；/bootstrap 失敗時各自退回原本的獨立 API
+async function loadDay(date) {
+    if (isLoading) return;
+    isLoading = true; // 在第一個 await 之前鎖住，連續切換日期時不會同時發出多個 /bootstrap
+    let boot = null;
+    try {
+        boot = await apiBootstrap(date);
+        if (boot.status !== "success") boot = null;
+    } catch (e) { boot = null; }
+    finally { isLoading = false; }
+
+    // 等待期間日期已被切換：丟棄過期回應，改載入目前選取的日期 (否則舊日期的卡片會被存進新日期)
+    const datePicker = document.getElementById('date-picker');
+    if (datePicker && datePicker.value !== date) return loadDay(datePicker.value);
+
     await Promise.all([
-        loadDateLogs(localDate),
-        typeof initHabits === 'function' ? initHabits(localDate) : Promise.resolve()
+        loadDateLogs(date, boot),
+        typeof initHabits === 'function' ? initHabits(date, boot) : Promise.resolve()
     ]);
-};
+}
 
 async function handleDateChange(newDate) {
     if (isLoading) return;
     if (isModified) await saveToBackend();
-    await Promise.all([
-        loadDateLogs(newDate),
-        typeof initHabits === 'function' ? initHabits(newDate) : Promise.resolve()
-    ]);
+    await loadDay(newDate);
 }
 
 // --- 標籤膠囊系統 ---
@@ -158,13 +207,13 @@ function updateStatus(state) {
 
 // --- 核心邏輯：新增與渲染 ---
 
-async function loadDateLogs(date) {
+async function loadDateLogs(date, preloaded = null) {
     if (isLoading) return;
     isLoading = true;
-    container.innerHTML = '<div class="col-span-full py-20 text-center text-gray-300"><i class="fa-solid fa-spinner fa-spin text-2xl"></i></div>';
+    if (!preloaded) container.innerHTML = '<div class="col-span-full py-20 text-center text-gray-300"><i class="fa-solid fa-spinner fa-spin text-2xl"></i></div>';
 
     try {
-        const res = await apiGetLog(date);
+        const res = preloaded || await apiGetLog(date);
         container.innerHTML = "";
         if (res.status === "success" && res.items.length > 0) {
             for (const it of res.items) {
@@ -270,7 +319,13 @@ async function addNewItem(title = "", content = "", isDone = false, tags = "", i
     if (tags) tags.split(' ').forEach(t => createTagCapsule(t, tagBox));
 
     autoResize(itemDiv.querySelector('textarea'));
-    if (title.trim()) await renderHistory(itemDiv, title, tags);
+    if (title.trim()) scheduleHistory(itemDiv, title, tags);
+}
+
+// 歷史時間軸不影響互動：等瀏覽器閒置時再逐張補上，避免首屏被 N 個請求卡住
+function scheduleHistory(cardEl, title, tags) {
+    const idle = window.requestIdleCallback || (cb => setTimeout(cb, 200));
+    idle(() => renderHistory(cardEl, title, tags));
 }
 
 function autoResize(el) { el.style.height = 'auto'; el.style.height = el.scrollHeight + 'px'; }
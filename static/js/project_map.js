@@ -7,11 +7,13 @@
  * 4. 空容器保留：移除自動清理邏輯，允許空里程碑存在。
  */
 
+// 延遲載入：由 app.js 的 openProjectMap 在第一次開啟地圖時載入本模組 (及 Sortable.js)
+
 let currentMapOriginId = null;
 
 // --- 1. 開啟與關閉地圖 ---
 
-async function openProjectMap(originId) {
+async function showProjectMap(originId) {
     if (!originId || originId === 'null') {
         alert("此任務尚未連結到任何專案家族。");
         return;
@@ -0,0 +1,123 @@
+"""
+單一寫入協調器 (Single-Writer Coordinator)
+多 worker 部署時，所有寫入交易都透過本機 IPC 佇列送到同一個程序依序執行，
+避免多個程序同時搶 SQLite 寫入鎖而出現 `database is locked`。
+讀取不經過這裡，任何 worker 都可以直接開連線查詢。
+
+寫入函數的簽名統一為 `func(cursor, *args)`，必須是模組層級函數 (以 pickle 參照方式傳遞)。
+"""
+import os
+import queue
+import threading
+from multiprocessing.connection import Client, Listener
+
+from database import get_db_connection
+
+WRITER_ADDRESS_ENV = "DAILY_LOGGER_WRITER"
+WRITER_KEY_ENV = "DAILY_LOGGER_WRITER_KEY"
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _execute(conn, func, args):
+    """在單一交易內執行寫入函數，回傳 (status, value)"""
+    try:
+        result = func(conn.cursor(), *args)
+        conn.commit()
+        return "ok", result
+    except Exception as e:
+        conn.rollback()
+        return "error", e
+
+
+def _remote(address: str, job):
+    global _client
+    host, port = address.rsplit(":", 1)
+    key = bytes.fromhex(os.environ[WRITER_KEY_ENV])
+
+    # 沿用的連線可能已失效：只有在送出前/送出時失敗才重連重送一次。
+    # 一旦送出成功就不再重送，否則協調器可能已執行過，非冪等寫入 (新增習慣、里程碑) 會重複。
+    for attempt in range(2):
+        try:
+            if _client is None:
+                _client = Client((host, int(port)), authkey=key)
+            _client.send(job)
+            break
+        except (EOFError, OSError):
+            _client = None
+            if attempt:
+                raise
+
+    try:
+        return _client.recv()
+    except (EOFError, OSError):
+        _client = None
+        raise
+
+
+def run_write(func, *args):
+    """
+    執行一筆寫入交易
+    - 已設定協調器位址 (多 worker 模式)：送到協調器排隊執行
+    - 未設定 (單程序模式)：直接在本程序開連線執行
+    """
+    address = os.environ.get(WRITER_ADDRESS_ENV)
+    if address:
+        with _client_lock:
+            status, value = _remote(address, (func, args))
+    else:
+        with get_db_connection() as conn:
+            status, value = _execute(conn, func, args)
+
+    if status == "error":
+        raise value
+    return value
+
+
+# --- 協調器程序 ---
+
+def _drain(jobs: queue.Queue):
+    """唯一持有寫入連線的執行緒：依序消化佇列中的寫入工作"""
+    conn = get_db_connection()
+    while True:
+        func, args, reply = jobs.get()
+        reply.put(_execute(conn, func, args))
+
+
+def _serve_client(client, jobs: queue.Queue):
+    reply = queue.Queue(maxsize=1)
+    try:
+        while True:
+            func, args = client.recv()
+            jobs.put((func, args, reply))
+            status, value = reply.get()
+            try:
+                client.send((status, value))
+            except Exception:
+                # 例外物件無法序列化時，退化為一般 RuntimeError
+                client.send(("error", RuntimeError(repr(value))))
+    except (EOFError, OSError):
+        pass
+    finally:
+        client.close()
+
+
+def serve(address_pipe, authkey: bytes):
+    """協調器程序進入點：監聽本機埠，並把實際位址回報給啟動者"""
+    listener = Listener(("127.0.0.1", 0), authkey=authkey)
+    host, port = listener.address
+    address_pipe.send(f"{host}:{port}")
+    address_pipe.close()
+
+    jobs = queue.Queue()
+    threading.Thread(target=_drain, args=(jobs,), daemon=True).start()
+
+    while True:
+        try:
+            client = listener.accept()
+        except Exception as e:
+            # 驗證失敗等單一連線錯誤不應讓協調器停擺
+            print(f"⚠️ 寫入協調器拒絕連線: {e}")
+            continue
+        threading.Thread(target=_serve_client, args=(client, jobs), daemon=True).start()